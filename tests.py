@@ -15,6 +15,9 @@ from PyQt5.QtWidgets import QApplication
 from PyQt5.QtTest import QTest
 
 from uaclient.mainwindow import Window
+from uaclient.graphwidget import _peak_downsample, _push_rows, _push_vectorized
+
+import numpy as np
 
 
 class TestClient(unittest.TestCase):
@@ -59,6 +62,55 @@ class TestClient(unittest.TestCase):
         self.assertEqual(data, server_node.nodeid)
 
 
+class TestPeakDownsample(unittest.TestCase):
+    def test_keeps_extremes_and_last_sample(self):
+        # 900 samples on 300 pixels: chunks of 3 samples, nothing left over
+        # 1199 and 2399 samples: 2 and 5 samples left over, reduced as one more chunk
+        for n in (900, 1199, 2399):
+            x = np.arange(n, dtype=np.float32)
+            y = np.sin(x / 7).astype(np.float32)
+            y[-1] = 5  # newest sample is the maximum
+            xd, yd = _peak_downsample(x, y, 300)
+            self.assertLess(len(yd), len(y))
+            self.assertEqual(xd[0], x[0])
+            self.assertEqual(xd[-1], x[-1])
+            self.assertEqual(yd.max(), 5)
+            self.assertEqual(yd.min(), y.min())
+
+    def test_ramps_stay_monotonic(self):
+        x = np.arange(1000, dtype=np.float32)
+        for y in (x[::-1].copy(), x * 2):
+            xd, yd = _peak_downsample(x, y, 300)
+            self.assertLess(len(yd), len(y))
+            self.assertTrue((np.diff(xd) >= 0).all())
+            dy = np.diff(yd)
+            self.assertTrue((dy >= 0).all() or (dy <= 0).all())
+
+    def test_no_downsampling_below_three_samples_per_pixel(self):
+        x = np.arange(899, dtype=np.float32)
+        y = np.cos(x)
+        xd, yd = _peak_downsample(x, y, 300)
+        self.assertIs(xd, x)
+        self.assertIs(yd, y)
+
+
+class TestPushKernels(unittest.TestCase):
+    def test_rows_and_vectorized_agree(self):
+        n = 4
+        channels = np.zeros((3, 2 * n), dtype=np.float32)
+        heads = np.array([0, 2, 3], dtype=np.intp)  # the last rows wrap around first
+        channels_v, heads_v = channels.copy(), heads.copy()
+        masks = ([True, True, True], [True, False, True], [False, False, False], [False, True, True])
+        for step in range(3 * n):
+            values = np.arange(3, dtype=np.float32) + 10 * step
+            valid = np.array(masks[step % len(masks)], dtype=np.bool_)
+            _push_rows(channels, heads, values, valid, n)
+            _push_vectorized(channels_v, heads_v, values, valid, n)
+            np.testing.assert_array_equal(channels, channels_v)
+            np.testing.assert_array_equal(heads, heads_v)
+        # both halves of each row stay mirrored
+        np.testing.assert_array_equal(channels[:, :n], channels[:, n:])
+
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
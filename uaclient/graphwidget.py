@@ -1,7 +1,7 @@
 #! /usr/bin/env python3
 
 import logging
-from PyQt5.QtCore import QTimer, Qt
+from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QLabel
 
 from asyncua import ua
@@ -18,18 +18,94 @@ except ImportError:
     use_graph = False
 
 if use_graph:
-    pg.setConfigOptions(antialias=True)
     pg.setConfigOption('background', 'w')
     pg.setConfigOption('foreground', 'k')
 
 logger = logging.getLogger(__name__)
 
+# ByteString and Byte[] values, drawn as arrays of uint8
+_buffer_types = (bytes, bytearray, memoryview)
+
+
+def _push_rows(channels, heads, values, valid, n):
+    # ringbuffer: every sample is written twice (at head and head + n), so the
+    # last n samples in chronological order are always the contiguous view channels[i, head:head + n]
+    for i in range(values.shape[0]):
+        if valid[i]:
+            h = heads[i]
+            channels[i, h] = values[i]
+            channels[i, h + n] = values[i]
+            heads[i] = (h + 1) % n
+
+
+def _push_vectorized(channels, heads, values, valid, n):
+    # same as _push_rows, as whole-array numpy operations across all curves
+    rows = np.flatnonzero(valid)
+    h = heads[rows]
+    v = values[rows]
+    channels[rows, h] = v
+    channels[rows, h + n] = v
+    heads[rows] = (h + 1) % n
+
+
+def _peak_downsample(x, y, bins):
+    """
+    Reduce x, y to the minimum and maximum of y in chunks of len(y) // bins samples,
+    like pyqtgraph's 'peak' downsampling mode. Leftover samples form a last, shorter chunk,
+    so the newest samples of a trace are never dropped. Both extremes keep their own x
+    and are emitted in the order they were sampled, so no slope is drawn that is not in the data.
+    """
+    n = len(y)
+    ds = n // bins
+    if ds <= 2:
+        return x, y  # a min/max pair per 2 samples saves nothing
+    k = n // ds
+    offsets = np.arange(k) * ds
+    chunks = y[:k * ds].reshape(k, ds)
+    lo = chunks.argmin(axis=1) + offsets
+    hi = chunks.argmax(axis=1) + offsets
+    if k * ds < n:
+        tail = y[k * ds:]
+        lo = np.append(lo, k * ds + tail.argmin())
+        hi = np.append(hi, k * ds + tail.argmax())
+    idx = np.empty(2 * len(lo), dtype=np.intp)
+    idx[0::2] = np.minimum(lo, hi)
+    idx[1::2] = np.maximum(lo, hi)
+    return x[idx], y[idx]
+
+
+_push = None
+
+
+def _get_push():
+    """
+    Return the ringbuffer write kernel, compiled with numba if it is installed,
+    vectorized numpy otherwise.
+    numba is imported on first use only, it is slow to import and optional.
+    """
+    global _push
+    if _push is None:
+        try:
+            import numba
+        except ImportError:
+            _push = _push_vectorized
+        else:
+            _push = numba.njit(cache=True, fastmath=True)(_push_rows)
+    return _push
+
 
 class GraphUI(object):
 
     # use tango color schema (public domain)
     colorCycle = ['#4e9a06ff', '#ce5c00ff', '#3465a4ff', '#75507bff', '#cc0000ff', '#edd400ff']
-    acceptedDatatypes = ['Decimal128', 'Double', 'Float', 'Integer', 'UInteger']
+    acceptedDatatypeIds = frozenset({ua.ObjectIds.Double, ua.ObjectIds.Float, ua.ObjectIds.Integer, ua.ObjectIds.UInteger})
+    paintIntervall = 16  # ms, ~60 Hz
+    defaultAntialias = False  # antialiasing is the most expensive part of drawing a live trace
+
+    __slots__ = ('window', 'uaclient', '_node_list', '_node_index', '_channels', '_heads', '_curves',
+                 '_handles', '_latest', '_names', '_sub', '_sub_client', '_dirty', 'antialias',
+                 'pw', 'legend', 'N', 'ts', 'intervall',
+                 '__weakref__')  # PyQt holds weak references to the objects of connected slots
 
     def __init__(self, window, uaclient, connect_actions=True):
         self.window = window
@@ -40,11 +116,23 @@ class GraphUI(object):
             self.window.ui.graphLayout.addWidget(QLabel("pyqtgraph or numpy not installed"))
             return
         self._node_list = []  # holds the nodes to poll
-        self._channels = []  # holds the actual data
+        self._node_index = {}  # maps each node to its position in _node_list
+        self._channels = []  # holds the actual data, one row per node
+        self._heads = []  # holds the write position in each row
         self._curves = []  # holds the curve objects
+        self._handles = {}  # holds the monitored item handle of each subscribed node
+        self._latest = {}  # holds the last notified value of each node
+        self._names = {}  # holds the display name of each node, read once when added
+        self._sub = None
+        self._sub_client = None
+        self._dirty = False  # True when channels changed since the last repaint
+        self.antialias = self.defaultAntialias
         self.pw = pg.PlotWidget(name='Plot1')
         self.pw.showGrid(x=True, y=True, alpha=0.3)
         self.legend = self.pw.addLegend()
+        # clipping and downsampling depend on the visible range and on the plot width
+        self.pw.getViewBox().sigXRangeChanged.connect(self._invalidate)
+        self.pw.getViewBox().sigResized.connect(self._invalidate)
         self.window.ui.graphLayout.addWidget(self.pw)
 
         if connect_actions:
@@ -55,31 +143,78 @@ class GraphUI(object):
             self.window.ui.treeView.addAction(self.window.ui.actionAddToGraph)
             self.window.ui.treeView.addAction(self.window.ui.actionRemoveFromGraph)
 
+        # applies immediately, not with Apply which also clears the buffers and the subscription
+        self._antialiasCheckBox().setChecked(self.antialias)
+        self._antialiasCheckBox().toggled.connect(self.setAntialias)
+
+        # repaint at screen refresh rate, independent of the poll intervall
+        self.uaclient.add_poll_subscriber(self._paint, self.paintIntervall)
+
         # connect Apply button
         self.window.ui.buttonApply.clicked.connect(self.restartTimer)
         self.restartTimer()
 
     def restartTimer(self):
-        # stop current timer, if it exists
-        if hasattr(self, 'timer') and self.timer.isActive():
-            self.timer.stop()
+        # stop current sampling, if it exists
+        if hasattr(self, 'intervall'):
+            self.uaclient.remove_poll_subscriber(self._sample, self.intervall)
 
         # define the number of polls displayed in graph
         self.N = self.window.ui.spinBoxNumberOfPoints.value()
-        self.ts = np.arange(self.N)
+        self.ts = np.arange(self.N, dtype=np.float32)
         # define the poll intervall
         self.intervall = self.window.ui.spinBoxIntervall.value() 
 
+        self._reset_channels()
+
+        try:
+            # publishing interval of the subscription follows the poll intervall
+            self._resubscribe()
+        finally:
+            # start sampling, it only reads the last notified values, no network access
+            # the timer is shared with the other graph, both wake up together
+            # registered even if resubscribing failed, the next Apply removes it again
+            self.uaclient.add_poll_subscriber(self._sample, self.intervall)
+
+    def _reset_channels(self):
         # overwrite current channel buffers with zeros of current length and add to curves again
-        for i, channel in enumerate(self._channels):
-            self._channels[i] = np.zeros(self.N)
-            self._curves[i].setData(self._channels[i])
+        # one row per curve, buffer is twice as long as displayed, see _push_rows
+        self._channels = np.zeros((len(self._node_list), 2 * self.N), dtype=np.float32)
+        self._heads = np.zeros(len(self._node_list), dtype=np.intp)
+        for i, curve in enumerate(self._curves):
+            curve.setData(self.ts, self._channels[i, :self.N])
+
+    def _remove_channel(self, idx):
+        self._channels = np.delete(self._channels, idx, axis=0)
+        self._heads = np.delete(self._heads, idx)
+
+    def _get_subscription(self):
+        client = self.uaclient.client
+        if self._sub is None or self._sub_client is not client:
+            self._sub = client.create_subscription(self.intervall, self)
+            self._sub_client = client
+            # new subscription, e.g. after a reconnect: subscribe the nodes already graphed
+            self._handles = {}
+            if self._node_list:
+                handles = self._sub.subscribe_data_change(self._node_list)
+                self._handles = dict(zip(self._node_list, handles))
+        return self._sub
+
+    def _resubscribe(self):
+        client = self.uaclient.client
+        if self._sub is not None and self._sub_client is client:
+            try:
+                self._sub.delete()
+            except Exception as ex:
+                logger.warning("Could not delete graph subscription: %s", ex)
+        self._sub = None
+        self._handles = {}
+        if client is not None and self._node_list:
+            self._get_subscription()
 
-        # starting new timer
-        self.timer = QTimer()
-        self.timer.setInterval(self.intervall)
-        self.timer.timeout.connect(self.pushtoGraph)
-        self.timer.start()
+    def datachange_notification(self, node, val, data):
+        # called from the asyncua thread, only store the value, plotting happens in _sample
+        self._latest[node] = val
 
     @trycatchslot
     def _add_node_to_channel(self, node=None):
@@ -87,25 +222,46 @@ class GraphUI(object):
             node = self.window.get_current_node()
             if node is None:
                 return
-        if node not in self._node_list:
-            dtype = node.read_attribute(ua.AttributeIds.DataType)
-
-            dtypeStr = ua.ObjectIdNames[dtype.Value.Value.Identifier]
-
-            if dtypeStr in self.acceptedDatatypes and not isinstance(node.get_value(), list):
+        if node not in self._node_index:
+            # one request instead of one per attribute
+            dtype, name, value = node.read_attributes(
+                [ua.AttributeIds.DataType, ua.AttributeIds.DisplayName, ua.AttributeIds.Value])
+
+            dtypeId = dtype.Value.Value
+
+            if dtypeId.NamespaceIndex == 0 and dtypeId.Identifier in self.acceptedDatatypeIds \
+                    and not isinstance(value.Value.Value, list):
+                # seed with the value just read, the subscription then only has to deliver changes
+                self._latest[node] = value.Value.Value
+                try:
+                    self._handles[node] = self._get_subscription().subscribe_data_change(node)
+                except Exception:
+                    self._latest.pop(node, None)
+                    raise
+                self._node_index[node] = len(self._node_list)
                 self._node_list.append(node)
-                displayName = node.read_display_name().Text
-                colorIndex = len(self._node_list) % len(self.colorCycle)
-                self._curves.append \
-                    (self.pw.plot(pen=pg.mkPen(color=self.colorCycle[colorIndex], width=3, style=Qt.SolidLine), name=displayName))
-                # set initial data to zero
-                self._channels.append(np.zeros(self.N))  # init data sequence with zeros
+                displayName = name.Value.Value.Text
+                self._names[node] = displayName
+                self._curves.append(self._new_curve(displayName))
+                # set initial data to zero, float32 is plenty for display
+                self._channels = np.vstack([self._channels, np.zeros((1, 2 * self.N), dtype=np.float32)])
+                self._heads = np.append(self._heads, 0)
                 # add the new channel data to the new curve
-                self._curves[-1].setData(self._channels[-1])
+                self._curves[-1].setData(self.ts, self._channels[-1, :self.N])
                 logger.info("Variable %s added to graph", displayName)
 
             else:
-                logger.info("Variable cannot be added to graph because it is of type %s or an array", dtypeStr)
+                logger.info("Variable cannot be added to graph because it is of type %s or an array",
+                            ua.ObjectIdNames.get(dtypeId.Identifier, dtypeId))
+
+    def _new_curve(self, displayName):
+        colorIndex = len(self._node_list) % len(self.colorCycle)
+        pen = pg.mkPen(color=self.colorCycle[colorIndex], width=3, style=Qt.SolidLine)
+        # a bare PlotCurveItem, PlotDataItem redoes styling and bounds bookkeeping on every setData
+        curve = pg.PlotCurveItem(pen=pen, name=displayName, antialias=self.antialias)
+        curve.setSkipFiniteCheck(True)
+        self.pw.addItem(curve)  # also adds it to the legend
+        return curve
 
     @trycatchslot
     def _remove_node_from_channel(self, node=None):
@@ -113,24 +269,89 @@ class GraphUI(object):
             node = self.window.get_current_node()
             if node is None:
                 return
-        if node in self._node_list:
-            idx = self._node_list.index(node)
+        if node in self._node_index:
+            idx = self._node_index.pop(node)
             self._node_list.pop(idx)
-            displayName = node.read_display_name().Text
+            for moved in self._node_list[idx:]:
+                self._node_index[moved] -= 1
+            displayName = self._names.pop(node)
             self.legend.removeItem(displayName)
             self.pw.removeItem(self._curves[idx])
             self._curves.pop(idx)
-            self._channels.pop(idx)
+            self._remove_channel(idx)
+            handle = self._handles.pop(node, None)
+            self._latest.pop(node, None)
+            if handle is not None and self._sub_client is self.uaclient.client:
+                try:
+                    self._sub.unsubscribe(handle)
+                except Exception as ex:
+                    logger.warning("Could not unsubscribe %s from graph subscription: %s", displayName, ex)
+
+    def _sample(self):
+        if not self._node_list:
+            return
+        client = self.uaclient.client
+        if client is not self._sub_client:
+            # disconnected or reconnected, the notified values belong to the old session
+            self._latest.clear()
+            if client is None:
+                return
+            try:
+                self._get_subscription()
+            except Exception as ex:
+                # only try once per client, Apply or adding a node tries again
+                self._sub, self._sub_client, self._handles = None, client, {}
+                logger.warning("Could not subscribe graphed nodes: %s", ex)
+                return
+        self.pushtoGraph([self._latest.get(node) for node in self._node_list])
+
+    def pushtoGraph(self, values):
+        count = len(values)
+        # None means no value notified yet, such channels are not advanced
+        valid = np.fromiter((value is not None for value in values), dtype=np.bool_, count=count)
+        vals = np.fromiter((0 if value is None else value for value in values), dtype=np.float32, count=count)
+        _get_push()(self._channels, self._heads, vals, valid, self.N)
+        self._dirty = True
+
+    def _paint(self):
+        if not self._dirty:
+            return
+        self._dirty = False
+        for i, curve in enumerate(self._curves):
+            h = self._heads[i]
+            self._setCurveData(curve, self.ts, self._channels[i, h:h + self.N])
 
-    def pushtoGraph(self):
-        # ringbuffer: shift and replace last
-        for i, node in enumerate(self._node_list):
-            self._channels[i] = np.roll(self._channels[i], -1)  # shift elements to the left by one
-            self._channels[i][-1] = float(node.get_value())
-            self._curves[i].setData(self.ts, self._channels[i])
+    def _invalidate(self, *args):
+        # redraw all curves on the next frame
+        self._dirty = True
 
-    def clear(self):
-        pass
+    def _setCurveData(self, curve, x, y):
+        """
+        Hand only what can be seen to the curve: the samples in the visible x range,
+        reduced to a min/max pair per pixel column when there are at least 3 samples per pixel.
+        """
+        vb = self.pw.getViewBox()
+        if not vb.autoRangeEnabled()[0]:
+            # x always is 0, 1, 2, ... so the visible range maps directly to indices
+            x0, x1 = vb.viewRange()[0]
+            start = max(int(x0) - 1, 0)
+            stop = max(min(int(x1) + 2, len(y)), start)
+            x, y = x[start:stop], y[start:stop]
+        bins = int(vb.width())
+        if bins > 0 and len(y) >= 3 * bins:
+            x, y = _peak_downsample(x, y, bins)
+        curve.setData(x, y, antialias=self.antialias)
+
+    def _antialiasCheckBox(self):
+        # in the settings row of the graph
+        return self.window.ui.checkBoxAntialias
+
+    def setAntialias(self, enabled):
+        if enabled == self.antialias:
+            return
+        self.antialias = enabled
+        # redraw all curves, _setCurveData hands the setting to them
+        self._invalidate()
 
     def show_error(self, *args):
         self.window.show_error(*args)
@@ -145,11 +366,20 @@ class GraphArraysUI(GraphUI):
       - connections to actionAddToGraphArrays / actionRemoveFromGraphArrays
       - _add_node_to_channel to accept array data
       - pushtoGraph to update array data properly
+      - _paint to draw the full arrays
     """
 
+    defaultAntialias = True  # fidelity matters more than speed for arrays
+
+    __slots__ = ('_x_cache', '_spare', '_pending', '_values')
+
     def __init__(self, window, uaclient):
         # Call parent constructor
         super().__init__(window, uaclient, connect_actions=False)
+        self._x_cache = {}  # holds one x axis per array length
+        self._spare = []  # holds a second buffer per array, the next sample is written into it
+        self._pending = []  # True for curves whose array changed since they were last drawn
+        self._values = []  # holds the value each array was converted from
 
         # 1) Remove the PlotWidget from the old layout (graphLayout)
         #    and re-add it to the array graph layout
@@ -181,29 +411,47 @@ class GraphArraysUI(GraphUI):
                 return
 
         # If node is already in the list, do nothing
-        if node in self._node_list:
+        if node in self._node_index:
             logger.info("Node already added to arrays graph.")
             return
 
         try:
-            value = node.get_value()
+            name, value = node.read_attributes([ua.AttributeIds.DisplayName, ua.AttributeIds.Value])
+            value = value.Value.Value
             # Check if it's an array
-            if isinstance(value, (list, tuple)) or (use_graph and isinstance(value, np.ndarray)):
+            if self._is_array(value):
+                # convert first, arrays of strings or structures raise here
+                # and must not leave the node half added
+                arr_data = np.empty(len(value), dtype=np.float32)
+                try:
+                    self._write_array(arr_data, value)
+                except (TypeError, ValueError) as ex:
+                    logger.info("Array variable cannot be added to arrays graph, its values are not numeric: %s", ex)
+                    return
+
+                # seed with the value just read, the subscription then only has to deliver changes
+                self._latest[node] = value
+                try:
+                    self._handles[node] = self._get_subscription().subscribe_data_change(node)
+                except Exception:
+                    self._latest.pop(node, None)
+                    raise
+                self._node_index[node] = len(self._node_list)
                 self._node_list.append(node)
-                displayName = node.read_display_name().Text
-                colorIndex = len(self._node_list) % len(self.colorCycle)
-                pen = pg.mkPen(color=self.colorCycle[colorIndex], width=3, style=Qt.SolidLine)
-                new_curve = self.pw.plot(name=displayName, pen=pen)
+                displayName = name.Value.Value.Text
+                self._names[node] = displayName
+                new_curve = self._new_curve(displayName)
                 self._curves.append(new_curve)
 
                 # Store the array data in _channels (for consistency)
-                # This could be a list or np.array; here we store the last known array
-                arr_data = np.array(value) if isinstance(value, list) else value
+                # here we store the last known array
                 self._channels.append(arr_data)
+                self._spare.append(np.empty_like(arr_data))
+                self._values.append(value)
 
                 # Plot immediately
-                x_vals = np.arange(len(arr_data))
-                new_curve.setData(x_vals, arr_data)
+                self._setCurveData(new_curve, self._x_axis(len(arr_data)), arr_data)
+                self._pending.append(False)
 
                 logger.info("Array variable %s added to arrays graph", displayName)
             else:
@@ -211,22 +459,81 @@ class GraphArraysUI(GraphUI):
         except Exception as ex:
             logger.error("Error reading node value: %s", ex)
 
-    def pushtoGraph(self):
+    def pushtoGraph(self, values):
         """
-        Instead of ring-buffering, re-read each array node's value
-        and plot the full array each time.
+        Instead of ring-buffering, keep the full array
+        of each array node every time it is sampled.
         """
-        for i, node in enumerate(self._node_list):
+        for i, (node, value) in enumerate(zip(self._node_list, values)):
             try:
-                value = node.get_value()
-                if isinstance(value, (list, tuple)) or (use_graph and isinstance(value, np.ndarray)):
-                    arr_data = np.array(value) if isinstance(value, list) else value
-                    self._channels[i] = arr_data
-
-                    x_vals = np.arange(len(arr_data))
-                    self._curves[i].setData(x_vals, arr_data)
+                if value is self._values[i]:
+                    continue  # nothing notified since the last sample
+                self._values[i] = value
+                if self._is_array(value):
+                    arr_data = self._channels[i]
+                    if len(value) != arr_data.shape[0]:
+                        # size changed, the only case where buffers are reallocated
+                        arr_data = np.empty(len(value), dtype=np.float32)
+                        self._write_array(arr_data, value)
+                        self._channels[i] = arr_data
+                        self._spare[i] = np.empty_like(arr_data)
+                    else:
+                        spare = self._spare[i]
+                        self._write_array(spare, value)
+                        if np.array_equal(spare, arr_data):
+                            continue  # same content, keep the drawn array
+                        self._channels[i], self._spare[i] = spare, arr_data
+                    self._pending[i] = True
+                    self._dirty = True
                 else:
                     # If it's no longer an array, skip or log
                     logger.debug("Node %s no longer returning array data", node)
             except Exception as ex:
-                logger.error("Error updating array graph for node %s: %s", node, ex)
\ No newline at end of file
+                logger.error("Error updating array graph for node %s: %s", node, ex)
+
+    def _reset_channels(self):
+        # arrays are not ring-buffered, nothing to reset
+        pass
+
+    def _remove_channel(self, idx):
+        self._channels.pop(idx)
+        self._spare.pop(idx)
+        self._pending.pop(idx)
+        self._values.pop(idx)
+
+    def _paint(self):
+        if not self._dirty:
+            return
+        self._dirty = False
+        for i, (curve, arr_data) in enumerate(zip(self._curves, self._channels)):
+            if not self._pending[i]:
+                continue
+            self._setCurveData(curve, self._x_axis(len(arr_data)), arr_data)
+            self._pending[i] = False
+
+    def _antialiasCheckBox(self):
+        return self.window.ui.checkBoxAntialiasArrays
+
+    def _invalidate(self, *args):
+        self._pending = [True] * len(self._pending)
+        self._dirty = True
+
+    def _x_axis(self, n):
+        x_vals = self._x_cache.get(n)
+        if x_vals is None:
+            x_vals = self._x_cache[n] = np.arange(n, dtype=np.float32)
+        return x_vals
+
+    @staticmethod
+    def _is_array(value):
+        return isinstance(value, (list, tuple) + _buffer_types) or (use_graph and isinstance(value, np.ndarray))
+
+    @staticmethod
+    def _write_array(buf, value):
+        """
+        Copy value into the preallocated float32 buffer buf
+        """
+        if isinstance(value, _buffer_types):
+            # ByteString / Byte arrays, a view on the received buffer without any copy
+            value = np.frombuffer(value, dtype=np.uint8)
+        buf[:] = value
@@ -267,6 +267,9 @@ class Ui_MainWindow(object):
         self.spinBoxIntervall.setProperty("value", 5)
         self.spinBoxIntervall.setObjectName("spinBoxIntervall")
         self.horizontalLayout.addWidget(self.spinBoxIntervall)
+        self.checkBoxAntialias = QtWidgets.QCheckBox(self.dockWidgetContents_6)
+        self.checkBoxAntialias.setObjectName("checkBoxAntialias")
+        self.horizontalLayout.addWidget(self.checkBoxAntialias)
         self.buttonApply = QtWidgets.QPushButton(self.dockWidgetContents_6)
         self.buttonApply.setObjectName("buttonApply")
         self.horizontalLayout.addWidget(self.buttonApply)
@@ -286,6 +289,9 @@ class Ui_MainWindow(object):
         self.graphArraysLayout = QtWidgets.QVBoxLayout()
         self.graphArraysLayout.setSpacing(6)
         self.graphArraysLayout.setObjectName("graphArraysLayout")
+        self.checkBoxAntialiasArrays = QtWidgets.QCheckBox(self.dockWidgetContentsArrays)
+        self.checkBoxAntialiasArrays.setObjectName("checkBoxAntialiasArrays")
+        self.graphArraysLayout.addWidget(self.checkBoxAntialiasArrays)
         self.gridLayoutArrays.addLayout(self.graphArraysLayout, 0, 0, 1, 1)
         self.graphDockWidgetArrays.setWidget(self.dockWidgetContentsArrays)
         MainWindow.addDockWidget(QtCore.Qt.DockWidgetArea(2), self.graphDockWidgetArrays)
@@ -351,7 +357,8 @@ class Ui_MainWindow(object):
         MainWindow.setTabOrder(self.refView, self.evView)
         MainWindow.setTabOrder(self.evView, self.spinBoxNumberOfPoints)
         MainWindow.setTabOrder(self.spinBoxNumberOfPoints, self.spinBoxIntervall)
-        MainWindow.setTabOrder(self.spinBoxIntervall, self.buttonApply)
+        MainWindow.setTabOrder(self.spinBoxIntervall, self.checkBoxAntialias)
+        MainWindow.setTabOrder(self.checkBoxAntialias, self.buttonApply)
         MainWindow.setTabOrder(self.buttonApply, self.logTextEdit)
 
     def retranslateUi(self, MainWindow):
@@ -371,6 +378,8 @@ class Ui_MainWindow(object):
         self.graphDockWidgetArrays.setWindowTitle(_translate("MainWindow", "Graph-Arrays"))
         self.labelNumberOfPoints.setText(_translate("MainWindow", "Number of Points"))
         self.labelIntervall.setText(_translate("MainWindow", "Intervall [ms]"))
+        self.checkBoxAntialias.setText(_translate("MainWindow", "Antialiasing"))
+        self.checkBoxAntialiasArrays.setText(_translate("MainWindow", "Antialiasing"))
         self.buttonApply.setText(_translate("MainWindow", "Apply"))
         self.actionConnect.setText(_translate("MainWindow", "&Connect"))
         self.actionDisconnect.setText(_translate("MainWindow", "&Disconnect"))
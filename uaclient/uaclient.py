@@ -1,6 +1,6 @@
 import logging
 
-from PyQt5.QtCore import QSettings
+from PyQt5.QtCore import QSettings, QTimer
 
 from asyncua import ua
 from asyncua.sync import Client, SyncNode
@@ -32,6 +32,7 @@ class UaClient(object):
         self.user_private_key_path = None
         self.application_certificate_path = None
         self.application_private_key_path = None
+        self._poll_timers = {}  # interval -> [timer, callbacks]
         self.load_application_certificate_settings()
 
     def _reset(self):
@@ -150,6 +151,28 @@ class UaClient(object):
     def unsubscribe_datachange(self, node):
         self._datachange_sub.unsubscribe(self._subs_dc[node.nodeid])
 
+    def add_poll_subscriber(self, callback, interval):
+        """
+        call callback every interval ms
+        subscribers with the same interval share one timer and are woken up together
+        """
+        if interval not in self._poll_timers:
+            timer = QTimer()
+            timer.setInterval(interval)
+            timer.start()
+            self._poll_timers[interval] = [timer, []]
+        timer, callbacks = self._poll_timers[interval]
+        timer.timeout.connect(callback)
+        callbacks.append(callback)
+
+    def remove_poll_subscriber(self, callback, interval):
+        timer, callbacks = self._poll_timers[interval]
+        callbacks.remove(callback)
+        timer.timeout.disconnect(callback)
+        if not callbacks:
+            timer.stop()
+            del self._poll_timers[interval]
+
     def subscribe_events(self, node, handler):
         if not self._event_sub:
             print("subscirbing with handler: ", handler, dir(handler))